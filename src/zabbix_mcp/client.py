@@ -1,22 +1,145 @@
 """Zabbix API client wrapper."""
 
+import itertools
+import json
+import os
+import tempfile
+import threading
 import requests
 import logging
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
+
+from .cache import TTLCache
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "fast" extra
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional, enables streaming in iter_call()
+    ijson = None
 
 logger = logging.getLogger(__name__)
 
+# Connection pool sizing for the shared session. MCP tool calls run on worker
+# threads, so several requests can be in flight against the same host.
+POOL_CONNECTIONS = 20
+POOL_MAXSIZE = 50
+
+_JSON_HEADERS = {"Content-Type": "application/json-rpc"}
+
+# Cache lifetimes (seconds) for lookups that change slower or faster than the
+# configured default. host.get is only cached for lookups by host name.
+DEFAULT_CACHE_TTLS: Dict[str, float] = {
+    "hostgroup.get": 300,
+    "template.get": 300,
+    "role.get": 600,
+    "host.get": 30,
+}
+
+if orjson is not None:
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+else:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+    
+    _loads = json.loads
+
+
+# Queries behind the count_* methods and get_status_counts()
+_STATUS_COUNT_QUERIES: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "hosts": ("host.get", {}),
+    "problems": ("problem.get", {"recent": True}),
+    "triggers": ("trigger.get", {}),
+    "problem_triggers": ("trigger.get", {"filter": {"value": "1"}}),
+}
+
+# Params that shape a listing but not which objects match it
+_PAGE_ONLY_PARAMS = frozenset({"output", "limit", "sortfield", "sortorder", "preservekeys"})
+
+# Fragments of the error data Zabbix returns for an expired or unknown session
+_SESSION_ERROR_MARKERS = ("re-login", "Not authorised", "Not authorized")
+
 
 class ZabbixAPIError(Exception):
     """Zabbix API error."""
     pass
 
 
+class ZabbixRPCError(ZabbixAPIError):
+    """The API answered with a JSON-RPC error object, so the call was not applied."""
+    pass
+
+
+class _SessionExpiredError(ZabbixAPIError):
+    """API call rejected because the session token is no longer valid."""
+    pass
+
+
+class _BatchRejectedError(ZabbixAPIError):
+    """Server does not accept JSON-RPC batch requests."""
+    pass
+
+
+def _merge_params(params: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply caller overrides to default params; None drops a default."""
+    params.update(overrides)
+    return {key: value for key, value in params.items() if value is not None}
+
+
+def _api_error(error: Any, method: Optional[str] = None) -> ZabbixAPIError:
+    """
+    Build the exception for the "error" member of a JSON-RPC response.
+    
+    Returns _SessionExpiredError when the error says the session is no
+    longer valid, so every call path re-authenticates the same way.
+    """
+    if isinstance(error, dict):
+        error = error.get("data", error)
+    prefix = f"API error in {method}" if method else "API error"
+    if any(marker in str(error) for marker in _SESSION_ERROR_MARKERS):
+        return _SessionExpiredError(f"{prefix}: {error}")
+    return ZabbixRPCError(f"{prefix}: {error}")
+
+
+def _raise_on_error(events: Iterator[Tuple[str, str, Any]]) -> Iterator[Tuple[str, str, Any]]:
+    """Pass ijson events through, raising ZabbixAPIError on an error response."""
+    error: Dict[str, Any] = {}
+    for prefix, event, value in events:
+        if prefix == "error" or prefix.startswith("error."):
+            if prefix in ("error.message", "error.data"):
+                error[prefix[len("error."):]] = value
+            elif prefix == "error" and event == "end_map":
+                raise _api_error(error)
+            continue
+        yield prefix, event, value
+
+
 class ZabbixClient:
-    """Zabbix API client for direct API access."""
+    """Zabbix API client for direct API access.
+    
+    Instances are safe to share between threads and concurrent tool calls.
+    """
     
-    def __init__(self, base_url: str, username: str, password: str, verify_ssl: bool = True):
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        verify_ssl: bool = True,
+        session: Optional[requests.Session] = None,
+        cache_ttl: float = 60,
+        cache_size: int = 1024,
+        token_cache: Optional[str] = None,
+        cache_ttls: Optional[Dict[str, float]] = None,
+    ):
         """
         Initialize Zabbix API client.
         
@@ -25,32 +148,116 @@ class ZabbixClient:
             username: Zabbix API username
             password: Zabbix API password
             verify_ssl: Whether to verify SSL certificates
+            session: Optional pre-configured requests session to use as-is
+            cache_ttl: Seconds read-only lookups stay cached (0 disables)
+            cache_size: Maximum number of cached lookups (0 disables)
+            token_cache: Optional file path used to persist the session token
+            cache_ttls: Per-method cache lifetimes overriding cache_ttl
+                (default: DEFAULT_CACHE_TTLS)
         """
         self.base_url = base_url
         self.api_url = f"{base_url}/api_jsonrpc.php"
         self.username = username
         self.password = password
         self.verify_ssl = verify_ssl
-        self.token: Optional[str] = None
-        self.session = requests.Session()
-        self.session.verify = verify_ssl
-        self._request_id = 0
+        # Shared JSON-RPC envelope; "auth" is kept in sync by the token setter
+        self._base_payload: Dict[str, Any] = {"jsonrpc": "2.0", "auth": None}
+        self.token = None
+        self.session = session if session is not None else self._create_session(verify_ssl)
+        self._id_counter = itertools.count(1)
+        self._batch_supported = True
+        self._auth_lock = threading.Lock()
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.cache_ttls = dict(DEFAULT_CACHE_TTLS if cache_ttls is None else cache_ttls)
+        self.token_cache = token_cache
+    
+    @staticmethod
+    def _create_session(verify_ssl: bool) -> requests.Session:
+        """Create a keep-alive session with a pooled, retrying adapter."""
+        session = requests.Session()
+        session.verify = verify_ssl
+        
+        # Every JSON-RPC call is a POST, writes included, so only retry when
+        # the request cannot have been applied: failed connects and gateway
+        # errors where it never reached PHP. A read timeout, dropped
+        # connection or 504 may mean a host.create/user.update already ran.
+        retries = Retry(
+            total=3,
+            read=0,
+            other=0,
+            backoff_factor=0.2,
+            status_forcelist=[502, 503],
+            allowed_methods=["POST"],
+        )
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=retries,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # requests already sends "Connection: keep-alive" and an
+        # Accept-Encoding of what urllib3 can decode (br once brotli is installed)
+        session.headers.update({
+            "Content-Type": "application/json-rpc",
+        })
+        return session
+    
+    @property
+    def token(self) -> Optional[str]:
+        """Current session or API token."""
+        return self._base_payload["auth"]
+    
+    @token.setter
+    def token(self, value: Optional[str]) -> None:
+        self._base_payload["auth"] = value
     
     def _get_request_id(self) -> int:
-        """Get next request ID."""
-        self._request_id += 1
-        return self._request_id
+        """Get next request ID (atomic under the GIL)."""
+        return next(self._id_counter)
+    
+    def _post(self, payload: Any) -> Any:
+        """
+        POST a JSON-RPC payload and decode the response body.
+        
+        Raises:
+            RequestException: On transport or HTTP status errors
+            ZabbixAPIError: If the response is not valid JSON
+        """
+        response = self.session.post(
+            self.api_url, data=_dumps(payload), headers=_JSON_HEADERS, timeout=10
+        )
+        response.raise_for_status()
+        
+        try:
+            return _loads(response.content)
+        except ValueError as e:
+            raise ZabbixAPIError(f"Invalid JSON response: {e}")
     
     def authenticate(self) -> bool:
         """
         Authenticate with Zabbix API.
         
+        Reuses the token persisted in token_cache when it is still valid,
+        otherwise logs in with username and password.
+        
         Returns:
             True if authentication successful
             
         Raises:
             ZabbixAPIError: If authentication fails
         """
+        with self._auth_lock:
+            cached = self._load_cached_token()
+            if cached and self._check_token(cached):
+                self.token = cached
+                logger.info("Reusing cached Zabbix session")
+                return True
+        
+            return self._login()
+    
+    def _login(self) -> bool:
+        """Log in with username and password and persist the new token."""
         try:
             payload = {
                 "jsonrpc": "2.0",
@@ -62,10 +269,7 @@ class ZabbixClient:
                 "id": self._get_request_id(),
             }
             
-            response = self.session.post(self.api_url, json=payload, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._post(payload)
             
             if "error" in data:
                 raise ZabbixAPIError(f"Authentication failed: {data['error']}")
@@ -75,15 +279,70 @@ class ZabbixClient:
             
             self.token = data["result"]
             logger.info("Successfully authenticated with Zabbix")
+            self._store_cached_token()
             return True
             
         except RequestException as e:
             raise ZabbixAPIError(f"Connection error: {e}")
     
+    def _check_token(self, token: str) -> bool:
+        """Check whether a session token is still accepted by Zabbix."""
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "user.checkAuthentication",
+            "params": {"sessionid": token},
+            "id": self._get_request_id(),
+        }
+        try:
+            data = self._post(payload)
+        except (RequestException, ZabbixAPIError) as e:
+            logger.debug(f"Cached token check failed: {e}")
+            return False
+        return isinstance(data, dict) and "result" in data
+    
+    def _load_cached_token(self) -> Optional[str]:
+        """Read a persisted token for this server and user, if any."""
+        if not self.token_cache:
+            return None
+        try:
+            with open(self.token_cache, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(cached, dict):
+            return None
+        if cached.get("url") != self.api_url or cached.get("username") != self.username:
+            return None
+        return cached.get("token")
+    
+    def _store_cached_token(self) -> None:
+        """Atomically persist the current token (file mode 0600)."""
+        if not self.token_cache or not self.token:
+            return
+        
+        directory = os.path.dirname(os.path.abspath(self.token_cache))
+        data = json.dumps({"url": self.api_url, "username": self.username, "token": self.token})
+        try:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            # mkstemp creates the file with mode 0600
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".token-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp_path, self.token_cache)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not persist Zabbix token to {self.token_cache}: {e}")
+    
     def call(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
         """
         Make authenticated API call to Zabbix.
         
+        If the session has expired, logs in again once and retries.
+        
         Args:
             method: API method name (e.g., 'host.get')
             params: Method parameters
@@ -94,6 +353,27 @@ class ZabbixClient:
         Raises:
             ZabbixAPIError: If API call fails
         """
+        return self._with_reauth(self._call, method, params)
+    
+    def _with_reauth(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run an API request, logging in again once if the session expired."""
+        token = self.token
+        try:
+            return func(*args)
+        except _SessionExpiredError:
+            self._relogin(token)
+            return func(*args)
+    
+    def _relogin(self, expired_token: Optional[str]) -> None:
+        """Log in again after expired_token was rejected."""
+        with self._auth_lock:
+            # Another thread may already have logged in again
+            if self.token == expired_token:
+                logger.info("Zabbix session expired, logging in again")
+                self._login()
+    
+    def _call(self, method: str, params: Optional[Dict[str, Any]]) -> Any:
+        """Make a single authenticated API call without re-authentication."""
         if not self.token:
             raise ZabbixAPIError("Not authenticated. Call authenticate() first.")
         
@@ -101,70 +381,357 @@ class ZabbixClient:
             params = {}
         
         payload = {
-            "jsonrpc": "2.0",
+            **self._base_payload,
             "method": method,
             "params": params,
-            "auth": self.token,
             "id": self._get_request_id(),
         }
         
         try:
-            response = self.session.post(self.api_url, json=payload, timeout=10)
+            data = self._post(payload)
+        except RequestException as e:
+            raise ZabbixAPIError(f"Connection error: {e}")
+        
+        # Successful responses are the common case: look up "result" first
+        try:
+            return data["result"]
+        except KeyError:
+            pass
+        
+        error = data.get("error")
+        if error is None:
+            return {}
+        raise _api_error(error)
+    
+    def api_call(self, method: str, params: Any = None) -> Any:
+        """
+        Make authenticated API call to Zabbix; same as call().
+        
+        UserManagement has always called the client through this name.
+        """
+        return self.call(method, params)
+    
+    def iter_call(self, method: str, params: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """
+        Make authenticated API call and yield result elements as they are parsed.
+        
+        With ijson installed the response is parsed incrementally, so large
+        result lists are never fully materialized. Without it this falls back
+        to call().
+        
+        Args:
+            method: API method name (e.g., 'history.get')
+            params: Method parameters
+        
+        Yields:
+            Elements of the API result list
+        
+        Raises:
+            ZabbixAPIError: If API call fails
+        """
+        if ijson is None:
+            yield from self.call(method, params)
+            return
+        
+        # An expired session is reported instead of the result, so nothing
+        # has been yielded yet when the request has to be repeated.
+        token = self.token
+        try:
+            yield from self._iter_call(method, params)
+        except _SessionExpiredError:
+            self._relogin(token)
+            yield from self._iter_call(method, params)
+    
+    def _iter_call(self, method: str, params: Optional[Dict[str, Any]]) -> Iterator[Any]:
+        """Stream a single API call without re-authentication."""
+        if not self.token:
+            raise ZabbixAPIError("Not authenticated. Call authenticate() first.")
+        
+        payload = {
+            **self._base_payload,
+            "method": method,
+            "params": params if params is not None else {},
+            "id": self._get_request_id(),
+        }
+        
+        try:
+            response = self.session.post(
+                self.api_url, data=_dumps(payload), headers=_JSON_HEADERS, timeout=10, stream=True
+            )
             response.raise_for_status()
-            
-            data = response.json()
-            
-            if "error" in data:
-                error_msg = data["error"]
-                if isinstance(error_msg, dict):
-                    error_msg = error_msg.get("data", str(error_msg))
-                raise ZabbixAPIError(f"API error: {error_msg}")
-            
-            return data.get("result", {})
-            
         except RequestException as e:
             raise ZabbixAPIError(f"Connection error: {e}")
+        
+        with response:
+            # Reading response.raw bypasses requests' transparent gzip handling
+            response.raw.decode_content = True
+            events = _raise_on_error(ijson.parse(response.raw, use_float=True))
+            try:
+                yield from ijson.items(events, "result.item")
+            except ijson.JSONError as e:
+                raise ZabbixAPIError(f"Invalid JSON response: {e}")
+    
+    def batch_call(
+        self, calls: List[Tuple[str, Optional[Dict[str, Any]]]], return_errors: bool = False
+    ) -> List[Any]:
+        """
+        Make several authenticated API calls in one JSON-RPC batch request.
+        
+        Args:
+            calls: List of (method, params) tuples
+            return_errors: Put a ZabbixAPIError in place of each failed
+                call's result instead of raising the first one
+        
+        Returns:
+            API response results, in the same order as calls
+        
+        Servers that reject batch requests get the calls sent concurrently
+        instead, and are not sent batches again.
+        
+        Raises:
+            ZabbixAPIError: If the request fails, or any call returns an error
+                and return_errors is not set
+        """
+        if self._batch_supported:
+            try:
+                return self._with_reauth(self._batch_call, calls, return_errors)
+            except _BatchRejectedError as e:
+                logger.info("%s; sending calls concurrently instead", e)
+                self._batch_supported = False
+        return self._concurrent_call(calls, return_errors)
+    
+    def _concurrent_call(
+        self, calls: List[Tuple[str, Optional[Dict[str, Any]]]], return_errors: bool = False
+    ) -> List[Any]:
+        """Make independent API calls in parallel over the shared session."""
+        def result_of(future: Any) -> Any:
+            try:
+                return future.result()
+            except ZabbixAPIError as e:
+                if not return_errors:
+                    raise
+                return e
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(len(calls), POOL_MAXSIZE))) as executor:
+            futures = [executor.submit(self.call, method, params) for method, params in calls]
+            return [result_of(future) for future in futures]
+    
+    def _batch_call(
+        self, calls: List[Tuple[str, Optional[Dict[str, Any]]]], return_errors: bool = False
+    ) -> List[Any]:
+        """Make a single batch request without re-authentication."""
+        if not self.token:
+            raise ZabbixAPIError("Not authenticated. Call authenticate() first.")
+        
+        if not calls:
+            return []
+        
+        payload = [
+            {
+                **self._base_payload,
+                "method": method,
+                "params": params if params is not None else {},
+                "id": self._get_request_id(),
+            }
+            for method, params in calls
+        ]
+        
+        try:
+            data = self._post(payload)
+        except RequestException as e:
+            raise ZabbixAPIError(f"Connection error: {e}")
+        
+        if not isinstance(data, list):
+            error_msg = data.get("error", data) if isinstance(data, dict) else data
+            raise _BatchRejectedError(f"Batch request rejected: {error_msg}")
+        
+        # Responses may come back in any order; match them up by id
+        by_id = {item.get("id"): item for item in data}
+        results = []
+        for request in payload:
+            item = by_id.get(request["id"])
+            if item is None:
+                raise ZabbixAPIError(f"No response for batched {request['method']}")
+            if "error" in item:
+                error = _api_error(item["error"], request["method"])
+                # An expired session fails every call in the batch alike
+                if not return_errors or isinstance(error, _SessionExpiredError):
+                    raise error
+                results.append(error)
+                continue
+            results.append(item.get("result", {}))
+        
+        return results
+    
+    def _get_cached(self, method: str, params: Dict[str, Any]) -> Any:
+        """
+        Make an API call, serving repeat lookups from the TTL cache.
+        
+        Only use for read-only methods whose data changes slowly. Entries
+        live for the method's cache_ttls entry, or the default cache TTL.
+        Empty results are not cached, so an object created elsewhere is
+        found on the next lookup.
+        """
+        key = self._cache_key(method, params)
+        result = self._cache.get(key)
+        if result is None:
+            result = self.call(method, params)
+            if result:
+                self._cache.set(key, result, self.cache_ttls.get(method))
+        return result
     
-    def get_hosts(self, **kwargs) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _cache_key(method: str, params: Dict[str, Any]) -> Tuple[str, str]:
+        """Build the TTL cache key for an API call."""
+        return (method, json.dumps(params, sort_keys=True, default=str))
+    
+    def invalidate_cache(self) -> None:
+        """Drop all cached lookups (call after write operations)."""
+        self._cache.clear()
+    
+    def invalidate_host_cache(self, hostname: Optional[str] = None) -> None:
+        """
+        Drop cached host lookups after a host was created or changed.
+        
+        Args:
+            hostname: Technical host name to drop; all hosts if omitted
+        """
+        if hostname is None:
+            self._cache.pop_where(lambda key: key[0] == "host.get")
+        else:
+            self._cache.pop(self._cache_key("host.get", self._host_by_name_params(hostname)))
+    
+    def count(self, method: str, params: Optional[Dict[str, Any]] = None) -> int:
         """
-        Get all hosts.
+        Count matching objects without fetching them (countOutput).
+        
+        Args:
+            method: A *.get API method
+            params: Filter params for the method
+        
+        Returns:
+            Number of matching objects
+        """
+        return int(self.call(method, {**(params or {}), "countOutput": True}))
+    
+    def get_page(
+        self, method: str, params: Dict[str, Any], limit: int, use_cache: bool = False
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Fetch the first rows of a listing together with the total count.
+        
+        The rows and the countOutput query go out in one batch request, so
+        a truncated listing still costs a single round trip.
+        
+        Args:
+            method: A *.get API method
+            params: Method params (without limit)
+            limit: Maximum number of rows to return
+            use_cache: Serve repeat calls from the TTL cache
+        
+        Returns:
+            Tuple of (rows, total number of matching objects)
+        """
+        key = self._cache_key(method, {"page": params, "limit": limit})
+        if use_cache:
+            page = self._cache.get(key)
+            if page is not None:
+                return page
+        
+        # The count only needs the filters, not what would be returned
+        filters = {
+            name: value for name, value in params.items()
+            if name not in _PAGE_ONLY_PARAMS and not name.startswith("select")
+        }
+        rows, total = self.batch_call([
+            (method, {**params, "limit": limit}),
+            (method, {**filters, "countOutput": True}),
+        ])
+        page = (rows, max(int(total), len(rows)))
+        if use_cache and rows:
+            self._cache.set(key, page, self.cache_ttls.get(method))
+        return page
+    
+    def get_hosts(
+        self, as_iterator: bool = False, **kwargs
+    ) -> Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """
+        Get all hosts (streamed if as_iterator).
+        
+        Keyword arguments override the default params; pass None to drop
+        one (e.g. selectInterfaces=None).
         
         Returns:
             List of hosts
         """
         params = {
-            "output": "extend",
-            "selectInterfaces": "extend",
+            "output": ["hostid", "host", "name", "status"],
+            "selectInterfaces": ["interfaceid", "ip", "port", "type"],
         }
-        params.update(kwargs)
+        params = _merge_params(params, kwargs)
+        if as_iterator:
+            return self.iter_call("host.get", params)
         return self.call("host.get", params)
     
-    def get_host_by_name(self, hostname: str) -> Optional[Dict[str, Any]]:
-        """Get host by name."""
-        hosts = self.call("host.get", {
-            "output": "extend",
+    def expand_hosts(self, records: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+        """
+        Replace the ID-only "hosts" of each record with full host objects.
+        
+        Resolves every distinct host with a single host.get instead of
+        having Zabbix embed a full copy of the host in each record.
+        
+        Args:
+            records: Triggers/events/items as returned by the get_* methods
+            **kwargs: Extra host.get parameters (e.g., output="extend")
+        
+        Returns:
+            The same records, updated in place
+        """
+        hostids = {h["hostid"] for record in records for h in record.get("hosts", [])}
+        if not hostids:
+            return records
+        
+        hosts_by_id = {h["hostid"]: h for h in self.get_hosts(hostids=sorted(hostids), **kwargs)}
+        for record in records:
+            record["hosts"] = [hosts_by_id.get(h["hostid"], h) for h in record.get("hosts", [])]
+        return records
+    
+    @staticmethod
+    def _host_by_name_params(hostname: str) -> Dict[str, Any]:
+        """Build host.get params for a lookup by technical name."""
+        return {
+            "output": ["hostid", "host", "name", "status", "description"],
             "filter": {"host": hostname},
-            "selectInterfaces": "extend",
-            "selectParentTemplates": "extend",
-        })
+            "selectInterfaces": ["interfaceid", "ip", "port", "type"],
+            "selectParentTemplates": ["templateid", "name"],
+        }
+    
+    def get_host_by_name(self, hostname: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """Get host by name."""
+        params = self._host_by_name_params(hostname)
+        hosts = self._get_cached("host.get", params) if use_cache else self.call("host.get", params)
         return hosts[0] if hosts else None
     
     def get_triggers(self, **kwargs) -> List[Dict[str, Any]]:
-        """Get all triggers."""
+        """
+        Get all triggers.
+        
+        Keyword arguments override the default params; pass None to drop one.
+        """
         params = {
-            "output": "extend",
-            "selectHosts": "extend",
+            "output": ["triggerid", "description", "priority", "value", "lastchange"],
+            "selectHosts": ["hostid", "host", "name"],
         }
-        params.update(kwargs)
+        params = _merge_params(params, kwargs)
         return self.call("trigger.get", params)
     
     def get_events(self, limit: int = 100, **kwargs) -> List[Dict[str, Any]]:
         """Get recent events."""
         params = {
-            "output": "extend",
+            "output": ["eventid", "clock", "name", "severity", "value"],
             "limit": limit,
             "sortfield": "clock",
-            "selectHosts": "extend",
+            "selectHosts": ["hostid", "host", "name"],
         }
         params.update(kwargs)
         return self.call("event.get", params)
@@ -172,33 +739,104 @@ class ZabbixClient:
     def get_problems(self, **kwargs) -> List[Dict[str, Any]]:
         """Get active problems."""
         params = {
-            "output": "extend",
+            "output": ["eventid", "objectid", "clock", "name", "severity"],
             "recent": True,
         }
         params.update(kwargs)
         return self.call("problem.get", params)
     
-    def get_items(self, hostid: Optional[str] = None, **kwargs) -> List[Dict[str, Any]]:
-        """Get items, optionally filtered by host."""
+    def get_event_hosts(self, eventids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get the host names of events or problems.
+        
+        problem.get cannot select hosts, so problem listings resolve them
+        through event.get, which shares the event IDs.
+        
+        Args:
+            eventids: Event (or problem) IDs
+        
+        Returns:
+            Dict mapping event ID to its hosts (names only)
+        """
+        if not eventids:
+            return {}
+        events = self.call("event.get", {
+            "output": ["eventid"],
+            "eventids": eventids,
+            "selectHosts": ["name"],
+        })
+        return {event["eventid"]: event.get("hosts", []) for event in events}
+    
+    def count_hosts(self) -> int:
+        """Count all hosts."""
+        return self.count(*_STATUS_COUNT_QUERIES["hosts"])
+    
+    def count_problems(self) -> int:
+        """Count active problems."""
+        return self.count(*_STATUS_COUNT_QUERIES["problems"])
+    
+    def count_triggers(self) -> int:
+        """Count all triggers."""
+        return self.count(*_STATUS_COUNT_QUERIES["triggers"])
+    
+    def count_problem_triggers(self) -> int:
+        """Count triggers currently in the problem state."""
+        return self.count(*_STATUS_COUNT_QUERIES["problem_triggers"])
+    
+    def get_status_counts(self) -> Dict[str, int]:
+        """
+        Get host, problem and trigger counts in one batch request.
+        
+        Returns:
+            Dict with hosts, problems, triggers and problem_triggers counts
+        """
+        results = self.batch_call([
+            (method, {**params, "countOutput": True})
+            for method, params in _STATUS_COUNT_QUERIES.values()
+        ])
+        return {name: int(result) for name, result in zip(_STATUS_COUNT_QUERIES, results)}
+    
+    def get_items(
+        self,
+        hostid: Optional[str] = None,
+        as_iterator: bool = False,
+        host: Optional[str] = None,
+        **kwargs,
+    ) -> Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """
+        Get items, optionally filtered by host (streamed if as_iterator).
+        
+        The host can be given by ID or by technical name; filtering by name
+        saves resolving the host first. Keyword arguments override the
+        default params; pass None to drop one.
+        """
         params = {
-            "output": "extend",
-            "selectHosts": "extend",
+            "output": ["itemid", "hostid", "name", "key_", "lastvalue", "units", "value_type"],
+            "selectHosts": ["hostid", "host", "name"],
             "selectValueMaps": "extend",
         }
         if hostid:
             params["hostids"] = hostid
-        params.update(kwargs)
+        if host:
+            params["host"] = host
+        params = _merge_params(params, kwargs)
+        if as_iterator:
+            return self.iter_call("item.get", params)
         return self.call("item.get", params)
     
-    def get_history(self, itemid: str, limit: int = 100, **kwargs) -> List[Dict[str, Any]]:
-        """Get item history."""
+    def get_history(
+        self, itemid: str, limit: int = 100, as_iterator: bool = False, **kwargs
+    ) -> Union[List[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """Get item history (streamed if as_iterator)."""
         params = {
-            "output": "extend",
+            "output": ["itemid", "clock", "value", "ns"],
             "itemids": itemid,
             "limit": limit,
             "sortfield": "clock",
         }
         params.update(kwargs)
+        if as_iterator:
+            return self.iter_call("history.get", params)
         return self.call("history.get", params)
     
     def acknowledge_event(self, eventids: List[str], message: str = "") -> bool:
@@ -208,66 +846,94 @@ class ZabbixClient:
             "action": 1,
             "message": message,
         })
+        self.invalidate_cache()
         return True
     
     def get_dashboards(self, **kwargs) -> List[Dict[str, Any]]:
         """Get dashboards."""
         params = {
-            "output": "extend",
+            "output": ["dashboardid", "name"],
         }
         params.update(kwargs)
-        return self.call("dashboard.get", params)
+        return self._get_cached("dashboard.get", params)
     
     def get_groups(self, **kwargs) -> List[Dict[str, Any]]:
         """Get host groups."""
         params = {
-            "output": "extend",
+            "output": ["groupid", "name"],
         }
         params.update(kwargs)
-        return self.call("hostgroup.get", params)
+        return self._get_cached("hostgroup.get", params)
     
     def get_templates(self, **kwargs) -> List[Dict[str, Any]]:
         """Get all templates."""
         params = {
-            "output": "extend",
+            "output": ["templateid", "host", "name"],
         }
         params.update(kwargs)
-        return self.call("template.get", params)
+        return self._get_cached("template.get", params)
+    
+    def invalidate_role_cache(self) -> None:
+        """Drop cached role lookups."""
+        self._cache.pop_where(lambda key: key[0] == "role.get")
+    
+    def get_roles(self, **kwargs) -> List[Dict[str, Any]]:
+        """Get user roles."""
+        params = {
+            "output": ["roleid", "name", "type"],
+        }
+        params.update(kwargs)
+        return self._get_cached("role.get", params)
+    
+    @staticmethod
+    def _template_by_name_params(template_name: str) -> Dict[str, Any]:
+        """Build template.get params for a lookup by technical name."""
+        return {
+            "output": ["templateid", "host", "name"],
+            "filter": {"host": template_name},
+        }
     
     def get_template_by_name(self, template_name: str) -> Optional[Dict[str, Any]]:
         """Get template by name."""
-        templates = self.call("template.get", {
-            "output": "extend",
-            "filter": {"host": template_name},
-        })
+        templates = self._get_cached("template.get", self._template_by_name_params(template_name))
         return templates[0] if templates else None
     
-    def link_template(self, hostid: str, templateid: str) -> bool:
+    def link_template(
+        self,
+        hostid: str,
+        templateid: str,
+        existing_templates: Optional[List[Dict[str, Any]]] = None,
+    ) -> bool:
         """
         Link a template to a host (appends to existing templates).
         
         Args:
             hostid: Host ID
             templateid: Template ID
+            existing_templates: Host's current parentTemplates, if already
+                fetched; skips the host.get lookup
             
         Returns:
             True if successful
         """
         try:
-            # Get existing templates
-            host = self.call("host.get", {
-                "output": "extend",
-                "hostids": hostid,
-                "selectParentTemplates": "extend",
-            })
+            if existing_templates is None:
+                # Get existing templates
+                host = self.call("host.get", {
+                    "output": ["hostid"],
+                    "hostids": hostid,
+                    "selectParentTemplates": ["templateid"],
+                })
             
-            if not host:
-                raise ZabbixAPIError(f"Host with ID {hostid} not found")
+                if not host:
+                    raise ZabbixAPIError(f"Host with ID {hostid} not found")
+                
+                existing_templates = host[0].get("parentTemplates", [])
             
             # Build template list with existing templates + new template
             existing_templates = [
                 {"templateid": t["templateid"]}
-                for t in host[0].get("parentTemplates", [])
+                for t in existing_templates
             ]
             
             # Check if template already linked
@@ -284,6 +950,7 @@ class ZabbixClient:
                 "hostid": hostid,
                 "templates": existing_templates,
             })
+            self.invalidate_cache()
             return bool(result)
         except ZabbixAPIError as e:
             logger.error(f"Failed to link template: {e}")
@@ -300,12 +967,36 @@ class ZabbixClient:
         Returns:
             True if successful
         """
-        host = self.get_host_by_name(hostname)
-        if not host:
+        # The host lookup bypasses the cache: host.update replaces the whole
+        # template list, so a stale parentTemplates would unlink templates
+        # added in the meantime. Unless the template is already cached, both
+        # lookups share one batch request.
+        host_params = self._host_by_name_params(hostname)
+        template_params = self._template_by_name_params(template_name)
+        template_key = self._cache_key("template.get", template_params)
+        
+        templates = self._cache.get(template_key)
+        if templates is None:
+            hosts, templates = self.batch_call([
+                ("host.get", host_params),
+                ("template.get", template_params),
+            ])
+            # Like _get_cached(), don't keep a "not found" around
+            if templates:
+                self._cache.set(template_key, templates, self.cache_ttls.get("template.get"))
+        else:
+            hosts = self.call("host.get", host_params)
+        
+        if not hosts:
             raise ZabbixAPIError(f"Host '{hostname}' not found")
+        host = hosts[0]
         
-        template = self.get_template_by_name(template_name)
-        if not template:
+        if not templates:
             raise ZabbixAPIError(f"Template '{template_name}' not found")
+        template = templates[0]
         
-        return self.link_template(host["hostid"], template["templateid"])
+        return self.link_template(
+            host["hostid"],
+            template["templateid"],
+            existing_templates=host.get("parentTemplates", []),
+        )
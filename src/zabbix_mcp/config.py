@@ -1,9 +1,17 @@
 """Configuration management for Zabbix MCP."""
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
+DEFAULT_TOKEN_CACHE = os.path.join("~", ".cache", "zabbix-mcp", "token")
+
+_BOOL_VALUES = {
+    "true": True, "1": True, "yes": True,
+    "false": False, "0": False, "no": False,
+}
+
 
 @dataclass
 class ZabbixConfig:
@@ -15,35 +23,65 @@ class ZabbixConfig:
     port: int = 80
     https: bool = False
     verify_ssl: bool = True
+    cache_ttl: float = 60
+    cache_size: int = 1024
+    token_cache: Optional[str] = None
+    builtin_role_ids: Optional[Dict[str, str]] = None
+    strict_role_lookup: bool = False
+    base_url: str = field(init=False)
+    api_url: str = field(init=False)
     
-    @property
-    def base_url(self) -> str:
-        """Build base URL for Zabbix API."""
+    def __post_init__(self) -> None:
+        """Build base URL and API endpoint once."""
         protocol = "https" if self.https else "http"
-        return f"{protocol}://{self.host}:{self.port}"
+        self.base_url = f"{protocol}://{self.host}:{self.port}"
+        self.api_url = f"{self.base_url}/api_jsonrpc.php"
+
+
+def _parse_bool(value: Optional[str], default: bool) -> bool:
+    """Parse a boolean env value, falling back to default if unset or unrecognized."""
+    if value is None:
+        return default
+    return _BOOL_VALUES.get(value.strip().lower(), default)
+
+
+def _parse_role_ids(value: Optional[str]) -> Optional[Dict[str, str]]:
+    """Parse "Role name=ID,..." pairs; None if unset."""
+    if value is None:
+        return None
     
-    @property
-    def api_url(self) -> str:
-        """Get Zabbix API endpoint."""
-        return f"{self.base_url}/api_jsonrpc.php"
+    role_ids = {}
+    for pair in filter(str.strip, value.split(",")):
+        name, _, roleid = pair.rpartition("=")
+        if not name.strip() or not roleid.strip().isdigit():
+            raise ValueError(f"Invalid ZABBIX_BUILTIN_ROLE_IDS entry: {pair!r}")
+        role_ids[name.strip()] = roleid.strip()
+    return role_ids
 
 
 def load_config() -> ZabbixConfig:
     """Load configuration from environment variables."""
     load_dotenv()
+    env = os.environ
     
-    host = os.getenv("ZABBIX_HOST")
+    host = env.get("ZABBIX_HOST")
     if not host:
         raise ValueError("ZABBIX_HOST environment variable is required")
     
-    username = os.getenv("ZABBIX_USERNAME", "Admin")
-    password = os.getenv("ZABBIX_PASSWORD")
+    username = env.get("ZABBIX_USERNAME", "Admin")
+    password = env.get("ZABBIX_PASSWORD")
     if not password:
         raise ValueError("ZABBIX_PASSWORD environment variable is required")
     
-    port = int(os.getenv("ZABBIX_PORT", "80"))
-    https = os.getenv("ZABBIX_HTTPS", "false").lower() == "true"
-    verify_ssl = os.getenv("ZABBIX_VERIFY_SSL", "true").lower() == "true"
+    port = int(env.get("ZABBIX_PORT", "80"))
+    https = _parse_bool(env.get("ZABBIX_HTTPS"), False)
+    verify_ssl = _parse_bool(env.get("ZABBIX_VERIFY_SSL"), True)
+    cache_ttl = float(env.get("ZABBIX_CACHE_TTL", "60"))
+    cache_size = int(env.get("ZABBIX_CACHE_SIZE", "1024"))
+    # An empty ZABBIX_TOKEN_CACHE disables token persistence
+    token_cache = os.path.expanduser(env.get("ZABBIX_TOKEN_CACHE", DEFAULT_TOKEN_CACHE)) or None
+    builtin_role_ids = _parse_role_ids(env.get("ZABBIX_BUILTIN_ROLE_IDS"))
+    strict_role_lookup = _parse_bool(env.get("ZABBIX_STRICT_ROLE_LOOKUP"), False)
     
     return ZabbixConfig(
         host=host,
@@ -52,4 +90,9 @@ def load_config() -> ZabbixConfig:
         port=port,
         https=https,
         verify_ssl=verify_ssl,
+        cache_ttl=cache_ttl,
+        cache_size=cache_size,
+        token_cache=token_cache,
+        builtin_role_ids=builtin_role_ids,
+        strict_role_lookup=strict_role_lookup,
     )
@@ -1,5 +1,6 @@
 """Zabbix MCP Server - Main MCP implementation."""
 
+import asyncio
 import logging
 import os
 from typing import Any
@@ -10,7 +11,7 @@ from mcp.types import Tool, TextContent
 
 from .config import load_config
 from .client import ZabbixClient, ZabbixAPIError
-from .tools import TOOLS, get_tool_handler
+from .tools import TOOLS, configure_user_management, get_tool_handler, validate_tool_args
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,15 +29,25 @@ def get_client() -> ZabbixClient:
 
 @server.list_tools()
 async def list_tools() -> list[Tool]:
-    return TOOLS
+    return list(TOOLS)
 
 
-@server.call_tool()
+# Arguments are checked by the precompiled validators in tools.py instead
+@server.call_tool(validate_input=False)
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
     zc = get_client()
+    # Raised errors reach the client as a result with isError=True, the same
+    # way the SDK's own input validation reports them
+    handler = get_tool_handler(name)
+    if handler is None:
+        raise ValueError(f"Unknown tool: {name}")
+    error = validate_tool_args(name, arguments)
+    if error is not None:
+        raise ValueError(f"Input validation error: {error}")
     try:
-        handler = get_tool_handler(name)
-        result = handler(zc, arguments)
+        # Handlers block on Zabbix round-trips; run them off the event loop so
+        # concurrent tool calls overlap instead of queueing behind each other.
+        result = await asyncio.to_thread(handler, zc, arguments)
         return [TextContent(type="text", text=str(result))]
     except ZabbixAPIError as e:
         return [TextContent(type="text", text=f"Zabbix API error: {e}")]
@@ -54,6 +65,13 @@ async def main_async():
         username=config.username,
         password=config.password,
         verify_ssl=config.verify_ssl,
+        cache_ttl=config.cache_ttl,
+        cache_size=config.cache_size,
+        token_cache=config.token_cache,
+    )
+    configure_user_management(
+        builtin_roles=config.builtin_role_ids,
+        strict_role_lookup=config.strict_role_lookup,
     )
 
     api_token = os.getenv("ZABBIX_API_TOKEN")
@@ -69,7 +87,6 @@ async def main_async():
 
 
 def main():
-    import asyncio
     asyncio.run(main_async())
 
 
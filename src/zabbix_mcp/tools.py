@@ -1,15 +1,26 @@
 """MCP Tool definitions and handlers."""
 
-import json
-from typing import Any, Callable, Dict, List, Optional
-from datetime import datetime
+import ipaddress
+import time
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 
 from mcp.types import Tool
 
 from .client import ZabbixClient
+from .user_management import UserManagement
+
+try:
+    import fastjsonschema
+    from fastjsonschema import JsonSchemaValueException as _ValidationError
+except ImportError:  # optional, generates faster argument validators
+    fastjsonschema = None
+    import jsonschema
+    from jsonschema import ValidationError as _ValidationError
 
 # Tool definitions
-TOOLS: List[Tool] = [
+TOOLS: Tuple[Tool, ...] = (
     Tool(
         name="get_hosts",
         description="List all monitored hosts in Zabbix",
@@ -152,25 +163,119 @@ TOOLS: List[Tool] = [
         description="Fix sequence table desynchronization (call this once after manual DB operations)",
         inputSchema={"type": "object", "properties": {}},
     ),
-]
+)
+
+# Tool definitions by name
+TOOLS_BY_NAME: Mapping[str, Tool] = MappingProxyType({tool.name: tool for tool in TOOLS})
+
+
+def _compile_validator(schema: Dict[str, Any]) -> Callable[[Dict[str, Any]], Any]:
+    """Build a reusable validation function for a tool inputSchema."""
+    if fastjsonschema is not None:
+        return fastjsonschema.compile(schema)
+    # Checking the schema once here spares jsonschema.validate() redoing it per call
+    validator = jsonschema.validators.validator_for(schema)(schema)
+    validator.check_schema(schema)
+    return validator.validate
+
+
+# Argument validators, compiled once at import
+VALIDATORS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    name: _compile_validator(tool.inputSchema) for name, tool in TOOLS_BY_NAME.items()
+}
+
+
+def validate_tool_args(name: str, args: Dict[str, Any]) -> Optional[str]:
+    """
+    Validate tool arguments against the tool's inputSchema.
+    
+    Args:
+        name: Tool name
+        args: Tool arguments
+    
+    Returns:
+        Error message if the arguments are invalid, otherwise None
+    """
+    validator = VALIDATORS.get(name)
+    if validator is None:
+        return None
+    try:
+        validator(args)
+    except _ValidationError as e:
+        return e.message
+    return None
+
+
+# Rows shown by the list handlers; only one more than this is fetched
+HOSTS_SHOWN = 20
+ITEMS_SHOWN = 15
+TEMPLATES_SHOWN = 20
+TRIGGERS_SHOWN = 10
+
+# Row labels for status codes; anything else gets the handler's default
+_HOST_STATUS = {"0": "Enabled"}
+_TRIGGER_STATE = {"1": "🔴 PROBLEM"}
+_IFACE_EMOJI = {
+    "available": "✅",
+    "checking": "🔄",
+    "unavailable": "❌",
+    "unknown": "❓",
+}
+
+
+def _host_names(hosts: List[Dict[str, Any]]) -> str:
+    """Render the hosts of a problem/event record as "name, name"."""
+    return ", ".join(h.get("name", "Unknown") for h in hosts)
+
+
+def _format_clock(clock: Any) -> str:
+    """Format a Zabbix unix timestamp as local "YYYY-MM-DD HH:MM:SS"."""
+    return _fmt_ts(int(clock))
+
+
+@lru_cache(maxsize=4096)
+def _fmt_ts(ts: int) -> str:
+    """Format an integer unix timestamp (cached)."""
+    # time.strftime on a struct_time skips building a datetime; events often
+    # share a second, so repeats are served from the cache.
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+# Extra UserManagement arguments, set once at startup
+_user_management_options: Dict[str, Any] = {}
+
+
+def configure_user_management(**options: Any) -> None:
+    """Set the UserManagement constructor options used by the user tools."""
+    _user_management_options.update(options)
+    _user_management.cache_clear()
+
+
+@lru_cache(maxsize=8)
+def _user_management(client: ZabbixClient) -> UserManagement:
+    """Return the UserManagement bound to client, creating it on first use."""
+    return UserManagement(client, **_user_management_options)
 
 
 def handle_get_hosts(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle get_hosts tool."""
     try:
-        hosts = client.get_hosts()
+        # The shown hosts and the total come back in one batch request
+        hosts, total = client.get_page("host.get", {"output": ["host", "name", "status"]}, HOSTS_SHOWN)
         if not hosts:
             return "No hosts found"
         
-        result = f"📋 Found {len(hosts)} hosts:\n\n"
-        for host in hosts[:20]:
-            result += f"🖥️ {host.get('name', 'Unknown')} ({host.get('host', 'N/A')})\n"
-            result += f"   Status: {'Enabled' if host.get('status') == '0' else 'Disabled'}\n"
+        parts = [f"📋 Found {total} hosts:\n\n"]
+        for host in hosts:
+            parts.append(
+                f"🖥️ {host.get('name', 'Unknown')} ({host.get('host', 'N/A')})\n"
+                f"   Status: {_HOST_STATUS.get(host.get('status'), 'Disabled')}\n"
+            )
         
-        if len(hosts) > 20:
-            result += f"\n... and {len(hosts) - 20} more hosts"
+        if total > HOSTS_SHOWN:
+            parts.append(f"\n... and {total - HOSTS_SHOWN} more hosts")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         return f"Error: {e}"
 
@@ -184,16 +289,18 @@ def handle_get_problems(client: ZabbixClient, args: Dict[str, Any]) -> str:
         if not problems:
             return "✅ No active problems"
         
-        result = f"⚠️ Active Problems: {len(problems)}\n\n"
-        for problem in problems[:10]:
-            hosts = problem.get("hosts", [])
-            host_names = ", ".join([h.get("name", "Unknown") for h in hosts])
-            result += f"• {problem.get('name', 'Unknown')} - {host_names}\n"
+        shown = problems[:10]
+        hosts_by_event = client.get_event_hosts([problem["eventid"] for problem in shown])
+        
+        parts = [f"⚠️ Active Problems: {len(problems)}\n\n"]
+        for problem in shown:
+            host_names = _host_names(hosts_by_event.get(problem["eventid"], []))
+            parts.append(f"• {problem.get('name', 'Unknown')} - {host_names}\n")
         
         if len(problems) > 10:
-            result += f"\n... and {len(problems) - 10} more"
+            parts.append(f"\n... and {len(problems) - 10} more")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         return f"Error: {e}"
 
@@ -202,20 +309,27 @@ def handle_get_triggers(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle get_triggers tool."""
     try:
         limit = args.get("limit", 50)
-        triggers = client.get_triggers(limit=limit)
+        # Fetch only the shown rows, counted in the same batch request; the
+        # total is capped at limit
+        triggers, total = client.get_page(
+            "trigger.get", {"output": ["description", "value"]}, min(limit, TRIGGERS_SHOWN)
+        )
         
         if not triggers:
             return "No triggers found"
+        total = min(total, limit)
         
-        result = f"🔔 Found {len(triggers)} triggers:\n\n"
-        for trigger in triggers[:10]:
-            status = "🔴 PROBLEM" if trigger.get("value") == "1" else "🟢 OK"
-            result += f"{status} - {trigger.get('description', 'Unknown')}\n"
+        parts = [f"🔔 Found {total} triggers:\n\n"]
+        parts.extend(
+            f"{_TRIGGER_STATE.get(trigger.get('value'), '🟢 OK')} - "
+            f"{trigger.get('description', 'Unknown')}\n"
+            for trigger in triggers
+        )
         
-        if len(triggers) > 10:
-            result += f"... and {len(triggers) - 10} more"
+        if total > TRIGGERS_SHOWN:
+            parts.append(f"... and {total - TRIGGERS_SHOWN} more")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         return f"Error: {e}"
 
@@ -224,22 +338,22 @@ def handle_get_events(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle get_events tool."""
     try:
         limit = args.get("limit", 20)
-        events = client.get_events(limit=limit)
+        # Only the clock and host names are rendered
+        events = client.get_events(limit=limit, output=["clock"], selectHosts=["name"])
         
         if not events:
             return "No events found"
         
-        result = f"📅 Recent Events ({len(events)}):\n\n"
+        parts = [f"📅 Recent Events ({len(events)}):\n\n"]
         for event in events[:10]:
-            timestamp = datetime.fromtimestamp(int(event.get("clock", 0))).strftime("%Y-%m-%d %H:%M:%S")
-            hosts = event.get("hosts", [])
-            host_names = ", ".join([h.get("name", "Unknown") for h in hosts])
-            result += f"⏰ {timestamp} - {host_names}\n"
+            timestamp = _format_clock(event.get("clock", 0))
+            host_names = _host_names(event.get("hosts", []))
+            parts.append(f"⏰ {timestamp} - {host_names}\n")
         
         if len(events) > 10:
-            result += f"... and {len(events) - 10} more"
+            parts.append(f"... and {len(events) - 10} more")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         return f"Error: {e}"
 
@@ -255,17 +369,21 @@ def handle_get_host_details(client: ZabbixClient, args: Dict[str, Any]) -> str:
         if not host:
             return f"Host '{hostname}' not found"
         
-        result = f"🖥️ Host Details: {host.get('name')}\n\n"
-        result += f"Host ID: {host.get('hostid')}\n"
-        result += f"Status: {'Enabled' if host.get('status') == '0' else 'Disabled'}\n"
+        parts = [
+            f"🖥️ Host Details: {host.get('name')}\n\n",
+            f"Host ID: {host.get('hostid')}\n",
+            f"Status: {_HOST_STATUS.get(host.get('status'), 'Disabled')}\n",
+        ]
         
         interfaces = host.get("interfaces", [])
         if interfaces:
-            result += f"\nInterfaces ({len(interfaces)}):\n"
-            for iface in interfaces:
-                result += f"  - {iface.get('ip', 'N/A')} ({iface.get('type', 'Unknown')})\n"
+            parts.append(f"\nInterfaces ({len(interfaces)}):\n")
+            parts.extend(
+                f"  - {iface.get('ip', 'N/A')} ({iface.get('type', 'Unknown')})\n"
+                for iface in interfaces
+            )
         
-        return result
+        return "".join(parts)
     except Exception as e:
         return f"Error: {e}"
 
@@ -274,27 +392,29 @@ def handle_get_items(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle get_items tool."""
     try:
         hostname = args.get("hostname")
-        hostid = None
         
+        # item.get filters by host name itself, saving the host lookup
+        params: Dict[str, Any] = {"output": ["name", "key_"]}
         if hostname:
-            host = client.get_host_by_name(hostname)
-            if not host:
-                return f"Host '{hostname}' not found"
-            hostid = host.get("hostid")
-        
-        items = client.get_items(hostid=hostid) if hostid else client.get_items()
+            params["host"] = hostname
+        items, total = client.get_page("item.get", params, ITEMS_SHOWN)
         
         if not items:
+            # Only now tell an unknown host apart from one without items
+            if hostname and not client.get_host_by_name(hostname):
+                return f"Host '{hostname}' not found"
             return "No items found"
         
-        result = f"📊 Monitored Items: {len(items)}\n\n"
-        for item in items[:15]:
-            result += f"• {item.get('name', 'Unknown')} ({item.get('key_', 'N/A')})\n"
+        parts = [f"📊 Monitored Items: {total}\n\n"]
+        parts.extend(
+            f"• {item.get('name', 'Unknown')} ({item.get('key_', 'N/A')})\n"
+            for item in items
+        )
         
-        if len(items) > 15:
-            result += f"... and {len(items) - 15} more"
+        if total > ITEMS_SHOWN:
+            parts.append(f"... and {total - ITEMS_SHOWN} more")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         return f"Error: {e}"
 
@@ -307,11 +427,10 @@ def handle_get_host_groups(client: ZabbixClient, args: Dict[str, Any]) -> str:
         if not groups:
             return "No host groups found"
         
-        result = f"👥 Host Groups: {len(groups)}\n\n"
-        for group in groups:
-            result += f"• {group.get('name')} (ID: {group.get('groupid')})\n"
+        parts = [f"👥 Host Groups: {len(groups)}\n\n"]
+        parts.extend(f"• {group.get('name')} (ID: {group.get('groupid')})\n" for group in groups)
         
-        return result
+        return "".join(parts)
     except Exception as e:
         return f"Error: {e}"
 
@@ -319,19 +438,15 @@ def handle_get_host_groups(client: ZabbixClient, args: Dict[str, Any]) -> str:
 def handle_get_system_status(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle get_system_status tool."""
     try:
-        hosts = client.get_hosts()
-        problems = client.get_problems()
-        triggers = client.get_triggers()
-        
-        result = "📊 Zabbix System Status\n\n"
-        result += f"Total Hosts: {len(hosts)}\n"
-        result += f"Active Problems: {len(problems)}\n"
-        result += f"Total Triggers: {len(triggers)}\n"
-        
-        problem_triggers = [t for t in triggers if t.get("value") == "1"]
-        result += f"Problem Triggers: {len(problem_triggers)}\n"
-        
-        return result
+        counts = client.get_status_counts()
+        
+        return (
+            "📊 Zabbix System Status\n\n"
+            f"Total Hosts: {counts['hosts']}\n"
+            f"Active Problems: {counts['problems']}\n"
+            f"Total Triggers: {counts['triggers']}\n"
+            f"Problem Triggers: {counts['problem_triggers']}\n"
+        )
     except Exception as e:
         return f"Error: {e}"
 
@@ -339,19 +454,23 @@ def handle_get_system_status(client: ZabbixClient, args: Dict[str, Any]) -> str:
 def handle_get_templates(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle get_templates tool."""
     try:
-        templates = client.get_templates()
+        templates, total = client.get_page(
+            "template.get", {"output": ["host", "name"]}, TEMPLATES_SHOWN, use_cache=True
+        )
         
         if not templates:
             return "No templates found"
         
-        result = f"📋 Available Templates: {len(templates)}\n\n"
-        for template in templates[:20]:
-            result += f"• {template.get('name')} ({template.get('host')})\n"
+        parts = [f"📋 Available Templates: {total}\n\n"]
+        parts.extend(
+            f"• {template.get('name')} ({template.get('host')})\n"
+            for template in templates
+        )
         
-        if len(templates) > 20:
-            result += f"\n... and {len(templates) - 20} more templates"
+        if total > TEMPLATES_SHOWN:
+            parts.append(f"\n... and {total - TEMPLATES_SHOWN} more templates")
         
-        return result
+        return "".join(parts)
     except Exception as e:
         return f"Error: {e}"
 
@@ -378,9 +497,7 @@ def handle_link_template(client: ZabbixClient, args: Dict[str, Any]) -> str:
 def handle_create_user(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle create_user tool."""
     try:
-        from .user_management import UserManagement
-        
-        um = UserManagement(client)
+        um = _user_management(client)
         result = um.create_user(
             username=args.get("username"),
             password=args.get("password"),
@@ -402,9 +519,7 @@ def handle_create_user(client: ZabbixClient, args: Dict[str, Any]) -> str:
 def handle_update_user(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle update_user tool."""
     try:
-        from .user_management import UserManagement
-        
-        um = UserManagement(client)
+        um = _user_management(client)
         result = um.update_user(
             userid=args.get("userid"),
             password=args.get("password"),
@@ -427,17 +542,15 @@ def handle_update_user(client: ZabbixClient, args: Dict[str, Any]) -> str:
 def handle_get_roles(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle get_roles tool."""
     try:
-        from .user_management import UserManagement
-        
-        um = UserManagement(client)
+        um = _user_management(client)
         result = um.get_roles()
         
         if result["roles"]:
-            output = f"📋 Available Roles ({result['total']}):\n\n"
+            parts = [f"📋 Available Roles ({result['total']}):\n\n"]
             for role in result["roles"]:
                 role_type = role.get("type", "unknown")
-                output += f"• {role['name']} (ID: {role['roleid']}) - Type: {role_type}\n"
-            return output
+                parts.append(f"• {role['name']} (ID: {role['roleid']}) - Type: {role_type}\n")
+            return "".join(parts)
         else:
             return "No roles found"
     except Exception as e:
@@ -447,36 +560,37 @@ def handle_get_roles(client: ZabbixClient, args: Dict[str, Any]) -> str:
 def handle_check_host_interface_availability(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle check_host_interface_availability tool."""
     try:
-        from .user_management import UserManagement
-        
-        um = UserManagement(client)
+        um = _user_management(client)
         result = um.check_host_interface_availability(args.get("hostid"))
         
-        status_emoji = {
-            "available": "✅",
-            "checking": "🔄",
-            "unavailable": "❌",
-            "unknown": "❓"
-        }
-        
-        emoji = status_emoji.get(result["status"], "❓")
-        output = f"{emoji} Host Interface Status\n"
-        output += f"Host: {result.get('host', 'Unknown')}\n"
-        output += f"Status: {result['status'].upper()}\n"
+        emoji = _IFACE_EMOJI.get(result["status"], "❓")
+        parts = [
+            f"{emoji} Host Interface Status\n",
+            f"Host: {result.get('host', 'Unknown')}\n",
+            f"Status: {result['status'].upper()}\n",
+        ]
         
         if result["interfaces"]:
-            output += f"Interfaces:\n"
-            for iface in result["interfaces"]:
-                output += f"  • {iface.get('ip')}:{iface.get('port')}\n"
+            parts.append("Interfaces:\n")
+            parts.extend(f"  • {iface.get('ip')}:{iface.get('port')}\n" for iface in result["interfaces"])
         
         if result.get("error"):
-            output += f"Error: {result['error']}"
+            parts.append(f"Error: {result['error']}")
         
-        return output
+        return "".join(parts)
     except Exception as e:
         return f"Error: {e}"
 
 
+def _is_ip_address(value: str) -> bool:
+    """Check for a valid IPv4/IPv6 address before sending it to Zabbix."""
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return True
+
+
 def handle_create_host(client: ZabbixClient, args: Dict[str, Any]) -> str:
     """Handle create_host tool - Create new Zabbix host for monitoring."""
     try:
@@ -490,12 +604,27 @@ def handle_create_host(client: ZabbixClient, args: Dict[str, Any]) -> str:
         if not all([hostname, display_name, ip_address]):
             return "❌ Error: hostname, display_name, and ip_address are required"
         
-        # Step 1: Create host
+        if not _is_ip_address(ip_address):
+            return f"❌ Error: invalid IP address '{ip_address}'"
+        
+        # Create host, interface and template link in one call; Zabbix
+        # applies it atomically, so a bad interface or template leaves no
+        # half-created host behind.
         host_params = {
             "host": hostname,
             "name": display_name,
             "groups": [{"groupid": group_id}],
+            "interfaces": [{
+                "type": 1,  # Agent type
+                "main": 1,  # Primary interface
+                "useip": 1,  # Use IP
+                "ip": ip_address,
+                "dns": "",
+                "port": port,
+            }],
         }
+        if template_id:
+            host_params["templates"] = [{"templateid": template_id}]
         
         host_result = client.call("host.create", host_params)
         if not host_result:
@@ -505,33 +634,15 @@ def handle_create_host(client: ZabbixClient, args: Dict[str, Any]) -> str:
         if not hostid:
             return f"❌ Failed to get hostid from creation response"
         
-        # Step 2: Add interface
-        interface_params = {
-            "hostid": hostid,
-            "type": 1,  # Agent type
-            "main": 1,  # Primary interface
-            "useip": 1,  # Use IP
-            "ip": ip_address,
-            "dns": "",
-            "port": port,
-        }
-        
-        interface_result = client.call("hostinterface.create", interface_params)
-        if not interface_result:
-            return f"⚠️ Host created (ID: {hostid}) but interface creation failed"
+        # Drop any cached "not found" lookup for the new host name
+        client.invalidate_host_cache(hostname)
         
-        interfaceid = interface_result[0] if isinstance(interface_result, list) else interface_result.get("interfaceids", [None])[0]
-        
-        # Step 3: Link template
-        if template_id:
-            update_params = {
-                "hostid": hostid,
-                "templates": [{"templateid": template_id}],
-            }
-            
-            template_result = client.call("host.update", update_params)
-            if not template_result:
-                return f"⚠️ Host created (ID: {hostid}) but template linking failed"
+        # host.create only reports the host ID
+        interfaces = client.call("hostinterface.get", {
+            "output": ["interfaceid"],
+            "hostids": hostid,
+        })
+        interfaceid = interfaces[0]["interfaceid"] if interfaces else None
         
         return f"""✅ Host Created Successfully!
         
@@ -558,6 +669,9 @@ def handle_add_host_interface(client: ZabbixClient, args: Dict[str, Any]) -> str
         if not all([hostid, ip_address]):
             return "❌ Error: hostid and ip_address are required"
         
+        if not _is_ip_address(ip_address):
+            return f"❌ Error: invalid IP address '{ip_address}'"
+        
         interface_params = {
             "hostid": hostid,
             "type": interface_type,
@@ -615,7 +729,7 @@ SELECT table_name, nextid FROM ids WHERE table_name IN ('hosts', 'interface', 'i
 
 
 # Tool handler registry
-TOOL_HANDLERS: Dict[str, Callable[[ZabbixClient, Dict[str, Any]], str]] = {
+TOOL_HANDLERS: Mapping[str, Callable[[ZabbixClient, Dict[str, Any]], str]] = MappingProxyType({
     "get_hosts": handle_get_hosts,
     "get_problems": handle_get_problems,
     "get_triggers": handle_get_triggers,
@@ -633,9 +747,15 @@ TOOL_HANDLERS: Dict[str, Callable[[ZabbixClient, Dict[str, Any]], str]] = {
     "create_host": handle_create_host,
     "add_host_interface": handle_add_host_interface,
     "sync_zabbix_sequences": handle_sync_zabbix_sequences,
-}
+})
+
+# Every advertised tool needs a handler and vice versa
+assert TOOLS_BY_NAME.keys() == TOOL_HANDLERS.keys() and len(TOOLS) == len(TOOLS_BY_NAME), \
+    "TOOLS and TOOL_HANDLERS are out of sync"
 
 
-def get_tool_handler(name: str) -> Optional[Callable[[ZabbixClient, Dict[str, Any]], str]]:
-    """Get handler for a tool by name."""
-    return TOOL_HANDLERS.get(name)
+# Get handler for a tool by name (None if unknown); bound directly to the
+# registry so dispatch skips a wrapper call.
+get_tool_handler: Callable[[str], Optional[Callable[[ZabbixClient, Dict[str, Any]], str]]] = (
+    TOOL_HANDLERS.get
+)
@@ -5,16 +5,71 @@ Provides tools for creating users, managing roles, and checking permissions.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import logging
+import math
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
 
-from .client import ZabbixClient
+from .client import ZabbixAPIError, ZabbixClient, ZabbixRPCError
+
+logger = logging.getLogger(__name__)
+
+# Interface availability names, indexed by the API's "available" value
+_AVAILABILITY = ("unknown", "available", "checking", "unavailable")
+
+# IDs of the roles every Zabbix installation starts with
+BUILTIN_ROLE_IDS: Mapping[str, str] = MappingProxyType({
+    "User role": "1",
+    "Admin role": "2",
+    "Super admin role": "3",
+    "Guest role": "4",
+})
+
+# After this many consecutive failed role lookups, stop asking for a while
+ROLE_LOOKUP_MAX_FAILURES = 2
+ROLE_LOOKUP_BACKOFF = 30.0  # seconds
+
+
+class RoleLookupError(ZabbixAPIError):
+    """Role name could not be checked against Zabbix (not the same as not found)."""
+    pass
+
+
+def _password_contains(password: str, **fields: Optional[str]) -> List[str]:
+    """Return the names of the fields whose value appears in password, ignoring case."""
+    folded = password.casefold()
+    return [field for field, value in fields.items() if value and value.casefold() in folded]
 
 
 class UserManagement:
     """Zabbix user and role management"""
     
-    def __init__(self, client: ZabbixClient):
+    def __init__(
+        self,
+        client: ZabbixClient,
+        builtin_roles: Optional[Mapping[str, str]] = None,
+        strict_role_lookup: bool = False
+    ):
+        """
+        Initialize user management.
+        
+        Args:
+            client: Authenticated Zabbix client
+            builtin_roles: Role name to ID map trusted without an API lookup
+                (default: BUILTIN_ROLE_IDS)
+            strict_role_lookup: Always look role names up in Zabbix, for
+                installations that renamed the built-in roles
+        """
         self.client = client
+        self.builtin_roles = {} if strict_role_lookup else dict(
+            BUILTIN_ROLE_IDS if builtin_roles is None else builtin_roles
+        )
+        # Tool calls run on worker threads; the lock guards the backoff state
+        self._role_lookup_lock = threading.Lock()
+        self._role_lookup_failures = 0
+        self._role_lookup_paused_until = 0.0
     
     def create_user(
         self,
@@ -49,75 +104,171 @@ class UserManagement:
             - Role must exist in Zabbix
             - Username must be unique
         """
-        validation_errors = []
-        
-        # Validate password doesn't contain username
-        if username.lower() in password.lower():
-            validation_errors.append("Password cannot contain username")
-        
-        # Validate password doesn't contain surname
-        if surname and surname.lower() in password.lower():
-            validation_errors.append("Password cannot contain surname")
-        
+        validation_errors = self._password_errors(username, password, surname)
         if validation_errors:
-            return {
-                "success": False,
-                "userid": None,
-                "message": "Password validation failed",
-                "validation_errors": validation_errors
-            }
+            return self._create_failed("Password validation failed", validation_errors)
         
         # Resolve role ID
-        role_id = self._resolve_role_id(role)
+        try:
+            role_id = self._resolve_role_id(role)
+        except RoleLookupError as e:
+            return self._create_failed(str(e), [str(e)])
         if not role_id:
-            return {
-                "success": False,
-                "userid": None,
-                "message": f"Role not found: {role}",
-                "validation_errors": [f"Unknown role: {role}"]
-            }
+            return self._create_failed(f"Role not found: {role}", [f"Unknown role: {role}"])
         
         try:
             # Create user via API
-            params = {
-                "username": username,
-                "passwd": password,
-                "roleid": role_id
-            }
-            
-            # Add optional fields
-            if email:
-                params["usrgrps"] = self._get_user_groups_by_email(email)
-            if name:
-                params["name"] = name
-            if surname:
-                params["surname"] = surname
-            
+            params = self._user_create_params(username, password, role_id, email, name, surname)
             result = self.client.api_call("user.create", params)
             
             if result and "userids" in result:
-                userid = result["userids"][0]
-                return {
-                    "success": True,
-                    "userid": userid,
-                    "message": f"User created successfully: {username}",
-                    "validation_errors": []
-                }
+                return self._created(username, result["userids"][0])
             else:
-                return {
-                    "success": False,
-                    "userid": None,
-                    "message": "Failed to create user",
-                    "validation_errors": ["API returned no user ID"]
-                }
+                return self._create_failed("Failed to create user", ["API returned no user ID"])
         
         except Exception as e:
-            return {
-                "success": False,
-                "userid": None,
-                "message": f"Error creating user: {str(e)}",
-                "validation_errors": [str(e)]
-            }
+            return self._create_failed(f"Error creating user: {str(e)}", [str(e)])
+    
+    def create_users_bulk(self, users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several Zabbix users in one API round trip.
+        
+        Args:
+            users: List of dicts with the create_user arguments (username,
+                password and optionally role, email, name, surname)
+        
+        Returns:
+            One create_user style result dict per user, in input order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(users)
+        role_ids: Dict[str, Union[str, None, RoleLookupError]] = {}
+        pending: List[Tuple[int, Dict[str, Any]]] = []
+        
+        for index, user in enumerate(users):
+            username = user["username"]
+            password = user["password"]
+            surname = user.get("surname")
+            
+            validation_errors = self._password_errors(username, password, surname)
+            if validation_errors:
+                results[index] = self._create_failed("Password validation failed", validation_errors)
+                continue
+            
+            # Resolve each distinct role once
+            role = user.get("role") or "Super admin role"
+            if role not in role_ids:
+                try:
+                    role_ids[role] = self._resolve_role_id(role)
+                except RoleLookupError as e:
+                    role_ids[role] = e
+            role_id = role_ids[role]
+            if isinstance(role_id, RoleLookupError):
+                results[index] = self._create_failed(str(role_id), [str(role_id)])
+                continue
+            if not role_id:
+                results[index] = self._create_failed(f"Role not found: {role}", [f"Unknown role: {role}"])
+                continue
+            
+            pending.append((index, self._user_create_params(
+                username, password, role_id, user.get("email"), user.get("name"), surname
+            )))
+        
+        if not pending:
+            return results
+        
+        outcomes: List[Any]
+        try:
+            try:
+                # user.create takes an array and creates all users or none
+                result = self.client.api_call("user.create", [params for _, params in pending])
+                outcomes = [{"userids": [userid]} for userid in (result or {}).get("userids", [])]
+            except ZabbixRPCError as e:
+                # One bad user fails the whole array; retry one call per user
+                # so the others still get created and each failure is reported.
+                # Connection errors are not retried: the array may already
+                # have been created.
+                logger.info(f"Bulk user.create failed ({e}), creating users individually")
+                outcomes = self.client.batch_call(
+                    [("user.create", params) for _, params in pending], return_errors=True
+                )
+        except Exception as e:
+            outcomes = [e] * len(pending)
+        
+        # Users without a matching ID in the response count as not created
+        outcomes.extend([None] * (len(pending) - len(outcomes)))
+        for (index, params), outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                results[index] = self._create_failed(f"Error creating user: {str(outcome)}", [str(outcome)])
+            elif outcome and outcome.get("userids"):
+                results[index] = self._created(params["username"], outcome["userids"][0])
+            else:
+                results[index] = self._create_failed("Failed to create user", ["API returned no user ID"])
+        
+        return results
+    
+    @staticmethod
+    def _password_errors(username: str, password: str, surname: Optional[str]) -> List[str]:
+        """Check a new password against the username and surname."""
+        return [
+            f"Password cannot contain {field}"
+            for field in _password_contains(password, username=username, surname=surname)
+        ]
+    
+    def _user_create_params(
+        self,
+        username: str,
+        password: str,
+        role_id: str,
+        email: Optional[str],
+        name: Optional[str],
+        surname: Optional[str]
+    ) -> Dict[str, Any]:
+        """Build user.create parameters for one user."""
+        params = {
+            "username": username,
+            "passwd": password,
+            "roleid": role_id
+        }
+        
+        # Add optional fields; an empty usrgrps list would be rejected
+        groups = self._get_user_groups_by_email(email) if email else None
+        if groups:
+            params["usrgrps"] = groups
+        if name:
+            params["name"] = name
+        if surname:
+            params["surname"] = surname
+        
+        return params
+    
+    @staticmethod
+    def _created(username: str, userid: str) -> Dict[str, Any]:
+        """Result dict for a created user."""
+        return {
+            "success": True,
+            "userid": userid,
+            "message": f"User created successfully: {username}",
+            "validation_errors": []
+        }
+    
+    @staticmethod
+    def _create_failed(message: str, validation_errors: List[str]) -> Dict[str, Any]:
+        """Result dict for a user that was not created."""
+        return {
+            "success": False,
+            "userid": None,
+            "message": message,
+            "validation_errors": validation_errors
+        }
+    
+    @staticmethod
+    def _update_failed(message: str) -> Dict[str, Any]:
+        """Result dict for a user update that was not applied."""
+        return {
+            "success": False,
+            "message": message,
+            "changes_made": []
+        }
     
     def update_user(
         self,
@@ -127,7 +278,9 @@ class UserManagement:
         current_password: Optional[str] = None,
         email: Optional[str] = None,
         name: Optional[str] = None,
-        surname: Optional[str] = None
+        surname: Optional[str] = None,
+        known_username: Optional[str] = None,
+        known_surname: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Update user properties.
@@ -140,6 +293,9 @@ class UserManagement:
             email: New email
             name: New first name
             surname: New surname
+            known_username: Current username, if the caller already has it;
+                skips looking the user up to validate a new password
+            known_surname: Current surname (used with known_username)
         
         Returns:
             Dict with:
@@ -151,46 +307,31 @@ class UserManagement:
         params = {"userid": userid}
         
         try:
-            # Get current user to check username/surname for password validation
-            current_user = self.client.api_call("user.get", {
-                "output": ["userid", "username", "surname"],
-                "userids": userid
-            })
-            
-            if not current_user:
-                return {
-                    "success": False,
-                    "message": f"User not found: {userid}",
-                    "changes_made": []
-                }
-            
-            current = current_user[0]
-            username = current.get("username")
-            current_surname = current.get("surname")
-            
             # Update password if provided
             if password:
                 if not current_password:
-                    return {
-                        "success": False,
-                        "message": "current_password required when changing password",
-                        "changes_made": []
-                    }
+                    return self._update_failed("current_password required when changing password")
                 
-                # Validate new password
-                if username and username.lower() in password.lower():
-                    return {
-                        "success": False,
-                        "message": "New password cannot contain username",
-                        "changes_made": []
-                    }
+                username = known_username
+                current_surname = known_surname
+                if username is None:
+                    # Get current user to check username/surname for password validation
+                    current_user = self.client.api_call("user.get", {
+                        "output": ["userid", "username", "surname"],
+                        "userids": userid
+                    })
+                    
+                    if not current_user:
+                        return self._update_failed(f"User not found: {userid}")
+                    
+                    current = current_user[0]
+                    username = current.get("username")
+                    current_surname = current.get("surname")
                 
-                if current_surname and current_surname.lower() in password.lower():
-                    return {
-                        "success": False,
-                        "message": "New password cannot contain surname",
-                        "changes_made": []
-                    }
+                # Validate new password
+                contained = _password_contains(password, username=username, surname=current_surname)
+                if contained:
+                    return self._update_failed(f"New password cannot contain {contained[0]}")
                 
                 params["passwd"] = password
                 params["current_passwd"] = current_password
@@ -228,18 +369,10 @@ class UserManagement:
                     "changes_made": changes
                 }
             else:
-                return {
-                    "success": False,
-                    "message": "Failed to update user",
-                    "changes_made": []
-                }
+                return self._update_failed("Failed to update user")
         
         except Exception as e:
-            return {
-                "success": False,
-                "message": f"Error updating user: {str(e)}",
-                "changes_made": []
-            }
+            return self._update_failed(f"Error updating user: {str(e)}")
     
     def get_roles(self) -> Dict[str, Any]:
         """
@@ -251,9 +384,7 @@ class UserManagement:
                 - total: int
         """
         try:
-            roles = self.client.api_call("role.get", {
-                "output": ["roleid", "name", "type"]
-            })
+            roles = self.client.get_roles()
             
             return {
                 "roles": roles or [],
@@ -335,33 +466,7 @@ class UserManagement:
                     "error": "Host not found"
                 }
             
-            host = hosts[0]
-            interfaces = host.get("interfaces", [])
-            
-            # Determine overall availability from interfaces
-            availability_map = {
-                "0": "unknown",
-                "1": "available",
-                "2": "checking",
-                "3": "unavailable"
-            }
-            
-            # Get most recent/primary interface status
-            primary_status = "unknown"
-            primary_available = 0
-            
-            if interfaces:
-                primary = interfaces[0]
-                primary_available = int(primary.get("available", 0))
-                primary_status = availability_map.get(str(primary_available), "unknown")
-            
-            return {
-                "hostid": hostid,
-                "host": host.get("host"),
-                "status": primary_status,
-                "available": primary_available,
-                "interfaces": interfaces
-            }
+            return self._shape_host_availability(hosts[0])
         
         except Exception as e:
             return {
@@ -372,6 +477,67 @@ class UserManagement:
                 "error": str(e)
             }
     
+    def check_host_interface_availability_many(
+        self,
+        hostids: List[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Check interface availability of several hosts with one API call.
+        
+        Args:
+            hostids: Host IDs
+        
+        Returns:
+            Dict mapping each hostid to a check_host_interface_availability
+            style result
+        """
+        try:
+            hosts = self.client.api_call("host.get", {
+                "output": ["hostid", "host", "status"],
+                "selectInterfaces": ["interfaceid", "ip", "port", "available"],
+                "hostids": list(hostids)
+            })
+            error = "Host not found"
+        except Exception as e:
+            hosts = []
+            error = str(e)
+        
+        results = {host["hostid"]: self._shape_host_availability(host) for host in hosts or []}
+        for hostid in hostids:
+            if hostid not in results:
+                results[hostid] = {
+                    "hostid": hostid,
+                    "status": "unknown",
+                    "available": 0,
+                    "interfaces": [],
+                    "error": error
+                }
+        
+        return results
+    
+    @staticmethod
+    def _shape_host_availability(host: Dict[str, Any]) -> Dict[str, Any]:
+        """Build an availability result from a host.get row with interfaces."""
+        interfaces = host.get("interfaces", [])
+        
+        # Get most recent/primary interface status
+        primary_status = "unknown"
+        primary_available = 0
+        
+        if interfaces:
+            primary = interfaces[0]
+            primary_available = int(primary.get("available", 0) or 0)
+            if 0 <= primary_available < len(_AVAILABILITY):
+                primary_status = _AVAILABILITY[primary_available]
+        
+        return {
+            "hostid": host.get("hostid"),
+            "host": host.get("host"),
+            "status": primary_status,
+            "available": primary_available,
+            "interfaces": interfaces
+        }
+    
     def _resolve_role_id(self, role: str) -> Optional[str]:
         """
         Resolve role name to ID.
@@ -381,25 +547,57 @@ class UserManagement:
         
         Returns:
             Role ID or None if not found
+        
+        Raises:
+            RoleLookupError: If Zabbix could not be asked, or lookups are
+                paused after repeated failures
         """
         # If already looks like an ID, return it
         if role.isdigit():
             return role
         
-        # Search by name
+        # Built-in roles keep their IDs unless renamed (see strict_role_lookup)
+        if role in self.builtin_roles:
+            return self.builtin_roles[role]
+        
+        with self._role_lookup_lock:
+            remaining = self._role_lookup_paused_until - time.monotonic()
+        if remaining > 0:
+            raise RoleLookupError(
+                f"Role lookup unavailable after repeated failures, retry in {math.ceil(remaining)}s"
+            )
+        
+        # Search by name, first in the cached role list (shared with get_roles)
         try:
+            for cached in self.client.get_roles():
+                if cached.get("name") == role:
+                    return cached["roleid"]
+            
+            # Not cached yet, e.g. a role created since the list was fetched
             roles = self.client.api_call("role.get", {
                 "output": ["roleid", "name"],
                 "filter": {"name": role}
             })
-            
-            if roles:
-                return roles[0]["roleid"]
-        except:
-            pass
+        except ZabbixAPIError as e:
+            with self._role_lookup_lock:
+                self._role_lookup_failures += 1
+                if self._role_lookup_failures >= ROLE_LOOKUP_MAX_FAILURES:
+                    self._role_lookup_paused_until = time.monotonic() + ROLE_LOOKUP_BACKOFF
+            logger.warning(f"Role lookup failed for {role!r}: {e}")
+            raise RoleLookupError(f"Role lookup failed: {e}") from e
+        
+        with self._role_lookup_lock:
+            self._role_lookup_failures = 0
+        if roles:
+            self.client.invalidate_role_cache()
+            return roles[0]["roleid"]
         
         return None
     
+    def invalidate_role_cache(self) -> None:
+        """Drop cached roles (call after roles were created, renamed or deleted)."""
+        self.client.invalidate_role_cache()
+    
     def _get_user_groups_by_email(self, email: str) -> List[Dict[str, str]]:
         """
         Get user groups (not implemented yet, placeholder).
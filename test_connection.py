@@ -9,7 +9,7 @@ load_dotenv()
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from zabbix_mcp.config import load_config
-from zabbix_mcp.client import ZabbixClient
+from zabbix_mcp.client import POOL_MAXSIZE, ZabbixClient
 
 
 def test_connection():
@@ -38,6 +38,14 @@ def test_connection():
         print(f"   ❌ Client error: {e}")
         return False
     
+    # Every API call should go through the client's one pooled session
+    adapter = client.session.get_adapter(config.base_url)
+    pool_size = adapter.poolmanager.connection_pool_kw.get("maxsize", 1)
+    if pool_size < POOL_MAXSIZE:
+        print(f"   ❌ Connection pool too small: {pool_size} (expected {POOL_MAXSIZE})")
+        return False
+    print(f"   ✅ Keep-alive pool of {pool_size} connections")
+    
     print("\n3️⃣  Authenticating with Zabbix...")
     try:
         client.authenticate()
@@ -50,12 +58,24 @@ def test_connection():
     try:
         hosts = client.get_hosts()
         print(f"   ✅ Found {len(hosts)} hosts")
+        # Interfaces come back with the same host.get; for extra per-host
+        # details pass all hostids to one call rather than one call per host
         for host in hosts[:3]:
-            print(f"      • {host.get('name')} ({host.get('host')})")
+            ips = ", ".join(iface.get("ip", "") for iface in host.get("interfaces", []))
+            print(f"      • {host.get('name')} ({host.get('host')}) {ips}")
     except Exception as e:
         print(f"   ❌ Error: {e}")
         return False
     
+    print("\n5️⃣  Checking connection reuse...")
+    # Sequential calls should all ride on one kept-alive connection
+    pools = adapter.poolmanager.pools
+    opened = sum(pools[key].num_connections for key in pools.keys())
+    if opened != 1:
+        print(f"   ❌ Opened {opened} connections for sequential calls (expected 1)")
+        return False
+    print(f"   ✅ All calls shared one connection")
+    
     print("\n" + "="*50)
     print("✅ Connection test successful!")
     print("="*50)